@@ -1,11 +1,16 @@
 
 import asyncio
 import time
-import statistics
 import json
-import uuid
-from typing import List, Dict, Any
+import multiprocessing
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
+from typing import Optional, Dict, Any, Tuple
 import httpx
+import orjson
+from hdrh.histogram import HdrHistogram
 
 
 class LoadTestConfig:
@@ -16,82 +21,142 @@ class LoadTestConfig:
         base_url: str = "http://localhost:8000",
         num_requests: int = 3000,
         concurrent_requests: int = 100,
-        num_users: int = 100
+        num_users: int = 100,
+        num_workers: Optional[int] = None
     ):
         self.base_url = base_url
         self.num_requests = num_requests
         self.concurrent_requests = concurrent_requests
         self.num_users = num_users
         self.target_rps = 300  # Target requests per second
+        # Client processes; one event loop per CPU by default
+        self.num_workers = max(1, min(
+            num_workers or os.cpu_count() or 1,
+            concurrent_requests,
+            num_requests
+        ))
 
 
+# HDR histogram range in microseconds: 1us to 60s at 3 significant digits
+_HDR_MAX_US = 60_000_000
+
+
+def _new_histogram() -> HdrHistogram:
+    return HdrHistogram(1, _HDR_MAX_US, 3)
+
+
+def _to_us(value_ns: int) -> int:
+    """Clamp a nanosecond reading into the histogram's microsecond range."""
+    return min(max(value_ns // 1000, 1), _HDR_MAX_US)
+
+
+@dataclass(slots=True)
 class LoadTestResults:
     """Containner for load test results."""
     
-    def __init__(self):
-        self.latencies: List[float] = []
-        self.errors: int = 0
-        self.total_requests: int = 0
-        self.start_time: float = 0
-        self.end_time: float = 0
+    total_requests: int = 0
+    errors: int = 0
+    # perf_counter_ns() readings
+    start_time: int = 0
+    end_time: int = 0
+    # Constant-memory latency histograms, from scheduled start and from send
+    _lat: HdrHistogram = field(default_factory=_new_histogram, repr=False)
+    _svc: HdrHistogram = field(default_factory=_new_histogram, repr=False)
     
-    def add_latency(self, latency: float):
-        """Add a latency measurement."""
-        self.latencies.append(latency)
+    @property
+    def successful_requests(self) -> int:
+        """Number of recorded latencies."""
+        return self._lat.get_total_count()
     
-    def add_error(self):
-        """Increment error count."""
-        self.errors += 1
-    
-    def increment_total(self):
-        """Increment total request count."""
+    def record(self, latency_ns: Optional[int], service_time_ns: Optional[int] = None):
+        """Record one request outcome; None latency is an error, None service time is skipped."""
         self.total_requests += 1
+        if latency_ns is None:
+            self.errors += 1
+            return
+        self._lat.record_value(_to_us(latency_ns))
+        if service_time_ns is not None:
+            self._svc.record_value(_to_us(service_time_ns))
+    
+    def merge(self, other: "LoadTestResults"):
+        """Fold another run's histograms and counters into this one."""
+        self._lat.add(other._lat)
+        self._svc.add(other._svc)
+        self.errors += other.errors
+        self.total_requests += other.total_requests
+    
+    def encode(self) -> Tuple[bytes, bytes, int, int]:
+        """Compact picklable form for handing results across processes."""
+        return self._lat.encode(), self._svc.encode(), self.errors, self.total_requests
+    
+    @classmethod
+    def decode(cls, encoded: Tuple[bytes, bytes, int, int]) -> "LoadTestResults":
+        """Rebuild results produced by encode()."""
+        lat, svc, errors, total_requests = encoded
+        return cls(
+            total_requests=total_requests,
+            errors=errors,
+            _lat=HdrHistogram.decode(lat),
+            _svc=HdrHistogram.decode(svc)
+        )
     
     def get_stats(self) -> Dict[str, Any]:
         """Get statistics from results."""
-        if not self.latencies:
+        successful = self.successful_requests
+        if successful == 0:
             return {
                 "total_requests": self.total_requests,
                 "successful_requests": 0,
                 "errors": self.errors,
                 "error_rate": 1.0 if self.total_requests > 0 else 0,
-                "duration_seconds": self.end_time - self.start_time,
+                "duration_seconds": (self.end_time - self.start_time) * 1e-9,
                 "rps": 0,
                 "min_latency_ms": 0,
                 "max_latency_ms": 0,
                 "mean_latency_ms": 0,
-                "p50_latency_ms": 0,
+                "median_latency_ms": 0,
                 "p95_latency_ms": 0,
-                "p99_latency_ms": 0
+                "p99_latency_ms": 0,
+                "mean_service_time_ms": 0,
+                "median_service_time_ms": 0,
+                "p95_service_time_ms": 0,
+                "p99_service_time_ms": 0
             }
         
-        latencies_ms = [l * 1000 for l in self.latencies]
-        duration = self.end_time - self.start_time
-        
-        latencies_ms.sort()
+        duration = (self.end_time - self.start_time) * 1e-9
+        lat = self._summarize(self._lat)
+        svc = self._summarize(self._svc)
         
         return {
             "total_requests": self.total_requests,
-            "successful_requests": len(self.latencies),
+            "successful_requests": successful,
             "errors": self.errors,
             "error_rate": self.errors / self.total_requests if self.total_requests > 0 else 0,
             "duration_seconds": duration,
-            "rps": len(self.latencies) / duration if duration > 0 else 0,
-            "min_latency_ms": min(latencies_ms),
-            "max_latency_ms": max(latencies_ms),
-            "mean_latency_ms": statistics.mean(latencies_ms),
-            "median_latency_ms": statistics.median(latencies_ms),
-            "p95_latency_ms": self._percentile(latencies_ms, 95),
-            "p99_latency_ms": self._percentile(latencies_ms, 99),
+            "rps": successful / duration if duration > 0 else 0,
+            "min_latency_ms": lat["min"],
+            "max_latency_ms": lat["max"],
+            "mean_latency_ms": lat["mean"],
+            "median_latency_ms": lat["p50"],
+            "p95_latency_ms": lat["p95"],
+            "p99_latency_ms": lat["p99"],
+            "mean_service_time_ms": svc["mean"],
+            "median_service_time_ms": svc["p50"],
+            "p95_service_time_ms": svc["p95"],
+            "p99_service_time_ms": svc["p99"],
         }
     
     @staticmethod
-    def _percentile(data: List[float], percentile: int) -> float:
-        """Calculate percentile from sorted data."""
-        if not data:
-            return 0
-        index = int((percentile / 100) * len(data))
-        return data[min(index, len(data) - 1)]
+    def _summarize(hist: HdrHistogram) -> Dict[str, float]:
+        """Summarize a non-empty microsecond histogram in milliseconds."""
+        return {
+            "min": hist.get_min_value() / 1000,
+            "max": hist.get_max_value() / 1000,
+            "mean": hist.get_mean_value() / 1000,
+            "p50": hist.get_value_at_percentile(50) / 1000,
+            "p95": hist.get_value_at_percentile(95) / 1000,
+            "p99": hist.get_value_at_percentile(99) / 1000,
+        }
 
 
 class LoadTester:
@@ -108,64 +173,40 @@ class LoadTester:
         print(f"  Total requests: {self.config.num_requests}")
         print(f"  Concurrent requests: {self.config.concurrent_requests}")
         print(f"  Target RPS: {self.config.target_rps}")
+        print(f"  Worker processes: {self.config.num_workers}")
         print()
         
-        self.results.start_time = time.time()
-        
-        async with httpx.AsyncClient(timeout=30.0) as client:
-            # Create batches of requests
-            tasks = []
-            for i in range(self.config.num_requests):
-                if len(tasks) >= self.config.concurrent_requests:
-                    # Execute batch
-                    await asyncio.gather(*tasks)
-                    tasks = []
-                
-                task = self._make_request(client, i)
-                tasks.append(task)
-            
-            # Execute remaining tasks
-            if tasks:
-                await asyncio.gather(*tasks)
+        # Aggregated results keep start_time at 0, so end_time is the duration
+        if self.config.num_workers == 1:
+            worker = _LoadWorker(self.config, 0)
+            await worker.run()
+            r = worker.results
+            self.results.merge(r)
+            self.results.end_time = r.end_time - r.start_time
+        else:
+            await asyncio.to_thread(self._run_workers)
         
-        self.results.end_time = time.time()
         self._print_results()
     
-    async def _make_request(self, client: httpx.AsyncClient, request_id: int):
-        """Make a single request."""
-        try:
-            user_id = f"user_{request_id % self.config.num_users}"
-            merchant_id = f"merchant_{request_id % 50}"
-            amount = 100 + (request_id % 900)
-            
-            payload = {
-                "txn_id": str(uuid.uuid4()),
-                "user_id": user_id,
-                "merchant_id": merchant_id,
-                "amount": float(amount),
-                "txn_type": "purchase",
-                "ts": int(time.time())
-            }
-            
-            start = time.time()
-            response = await client.post(
-                f"{self.config.base_url}/reward/decide",
-                json=payload
-            )
-            latency = time.time() - start
-            
-            self.results.increment_total()
-            
-            if response.status_code == 200:
-                self.results.add_latency(latency)
-            else:
-                self.results.add_error()
-                print(f"Error: {response.status_code} - {response.text}")
+    def _run_workers(self):
+        """Fan the run out over worker processes and merge their histograms."""
+        n = self.config.num_workers
+        ctx = multiprocessing.get_context("spawn")
+        barrier = ctx.Barrier(n)
+        with ProcessPoolExecutor(
+            max_workers=n,
+            mp_context=ctx,
+            initializer=_init_worker,
+            initargs=(barrier,)
+        ) as pool:
+            futures = [pool.submit(_run_worker, self.config, w) for w in range(n)]
+            outcomes = [f.result() for f in futures]
+        
+        for encoded, _ in outcomes:
+            self.results.merge(LoadTestResults.decode(encoded))
         
-        except Exception as e:
-            self.results.increment_total()
-            self.results.add_error()
-            print(f"Request failed: {e}")
+        # Workers start together on a barrier; the slowest one bounds the run
+        self.results.end_time = max(duration for _, duration in outcomes)
     
     def _print_results(self):
         """Print test results."""
@@ -188,6 +229,11 @@ class LoadTester:
         print(f"Median Latency:       {stats['median_latency_ms']:.2f}ms")
         print(f"P95 Latency:          {stats['p95_latency_ms']:.2f}ms")
         print(f"P99 Latency:          {stats['p99_latency_ms']:.2f}ms")
+        print("-"*60)
+        print(f"Mean Service Time:    {stats['mean_service_time_ms']:.2f}ms")
+        print(f"Median Service Time:  {stats['median_service_time_ms']:.2f}ms")
+        print(f"P95 Service Time:     {stats['p95_service_time_ms']:.2f}ms")
+        print(f"P99 Service Time:     {stats['p99_service_time_ms']:.2f}ms")
         print("="*60)
         
         # Assessment
@@ -234,6 +280,125 @@ class LoadTester:
         print("\nResults saved to load_test_results.json")
 
 
+class _LoadWorker:
+    """Drives one process's share of the requests on its own event loop."""
+    
+    def __init__(self, config: LoadTestConfig, worker_id: int):
+        self.config = config
+        # Interleaved ids keep every worker on the shared target_rps schedule
+        self._request_ids = range(worker_id, config.num_requests, config.num_workers)
+        self.results = LoadTestResults()
+        share, extra = divmod(config.concurrent_requests, config.num_workers)
+        self._concurrency = share + (1 if worker_id < extra else 0)
+        self._sem: Optional[asyncio.Semaphore] = None
+        self._url = f"{config.base_url}/reward/decide"
+        self._hdrs = {"content-type": "application/json"}
+        
+        # Payload field pools, indexed by request_id instead of formatted per call
+        self._users = [f"user_{i}" for i in range(config.num_users)]
+        self._merchants = [f"merchant_{i}" for i in range(50)]
+        self._amounts = [float(100 + i) for i in range(900)]
+        self._ts: int = 0
+        self._txn_prefix = ""
+        
+        # One shared client; keep-alive pool sized above the concurrency limit
+        # so in-flight requests never wait on a fresh TCP handshake
+        pool_size = self._concurrency * 2
+        self._client = httpx.AsyncClient(
+            http2=True,
+            limits=httpx.Limits(
+                max_connections=pool_size,
+                max_keepalive_connections=pool_size
+            ),
+            timeout=httpx.Timeout(connect=5.0, read=30.0, write=5.0, pool=5.0)
+        )
+    
+    async def run(self, barrier=None):
+        """Send this worker's requests, starting together with its peers."""
+        # Keep a steady number of requests in flight instead of draining batches
+        self._sem = asyncio.Semaphore(self._concurrency)
+        
+        async with self._client:
+            # Warm up the connection outside the measured window; a failure is
+            # only logged so every worker still reaches the barrier and the
+            # measured requests record their own errors
+            try:
+                await self._client.get(f"{self.config.base_url}/health")
+            except Exception as e:
+                print(f"Warm-up request failed: {e}")
+            if barrier is not None:
+                try:
+                    await asyncio.to_thread(barrier.wait, 60)
+                except threading.BrokenBarrierError:
+                    print("Start barrier broken; starting without peers")
+            
+            self._ts = int(time.time())
+            # pid + start time keeps txn_ids unique across runs, so the service
+            # never answers from its idempotency cache
+            self._txn_prefix = f"txn_{os.getpid()}_{self._ts}_"
+            t0 = time.perf_counter_ns()
+            self.results.start_time = t0
+            tasks = [
+                asyncio.create_task(self._make_request(i, t0))
+                for i in self._request_ids
+            ]
+            await asyncio.gather(*tasks, return_exceptions=True)
+        
+        self.results.end_time = time.perf_counter_ns()
+    
+    async def _make_request(self, request_id: int, t0: int):
+        """Make a single request at its scheduled offset from t0."""
+        # Pace to target_rps; latency counts from the scheduled start so that
+        # time spent queued behind slow requests is not hidden
+        scheduled = t0 + request_id * 1_000_000_000 // self.config.target_rps
+        now = time.perf_counter_ns()
+        if now < scheduled:
+            await asyncio.sleep((scheduled - now) * 1e-9)
+        
+        async with self._sem:
+            try:
+                body = orjson.dumps({
+                    "txn_id": f"{self._txn_prefix}{request_id:08d}",
+                    "user_id": self._users[request_id % self.config.num_users],
+                    "merchant_id": self._merchants[request_id % 50],
+                    "amount": self._amounts[request_id % 900],
+                    "txn_type": "purchase",
+                    "ts": self._ts
+                })
+                
+                start = time.perf_counter_ns()
+                response = await self._client.post(self._url, content=body, headers=self._hdrs)
+                end = time.perf_counter_ns()
+                
+                if response.status_code == 200:
+                    self.results.record(end - scheduled, end - start)
+                else:
+                    self.results.record(None)
+                    print(f"Error: {response.status_code} - {response.text}")
+            
+            except Exception as e:
+                self.results.record(None)
+                print(f"Request failed: {e}")
+
+
+# Set in each spawned worker by _init_worker
+_worker_barrier = None
+
+
+def _init_worker(barrier):
+    """Process pool initializer: keep the start barrier for _run_worker."""
+    global _worker_barrier
+    _worker_barrier = barrier
+
+
+def _run_worker(config: LoadTestConfig, worker_id: int):
+    """Run one worker share; return its encoded results and duration."""
+    worker = _LoadWorker(config, worker_id)
+    asyncio.run(worker.run(_worker_barrier))
+    r = worker.results
+    return r.encode(), r.end_time - r.start_time
+
+
 async def main():
     """Main entry point."""
     # Configure test parameters
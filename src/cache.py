@@ -1,9 +1,14 @@
 
 
+import heapq
 import json
 import time
-from typing import Optional, Any, Dict
+from typing import Optional, Any, Callable, Dict, List, Type, TypeVar
 from abc import ABC, abstractmethod
+import msgpack
+from pydantic import BaseModel
+
+M = TypeVar("M", bound=BaseModel)
 
 
 class CacheBackend(ABC):
@@ -33,6 +38,32 @@ class CacheBackend(ABC):
     def increment(self, key: str, amount: int = 1) -> int:
         """Increment numeric value."""
         pass
+    
+    def mget(self, keys: List[str]) -> List[Optional[Any]]:
+        """Get several values at once, in key order."""
+        return [self.get(key) for key in keys]
+    
+    def incrby(self, key: str, amount: float, ttl: Optional[int] = None) -> float:
+        """Add a float amount to a value, (re)setting its TTL; return the new value."""
+        new_value = (self.get(key) or 0) + amount
+        self.set(key, new_value, ttl)
+        return new_value
+    
+    def get_obj(
+        self,
+        key: str,
+        model: Type[M],
+        build: Optional[Callable[[Dict[str, Any]], M]] = None
+    ) -> Optional[M]:
+        """Get a model stored by set_obj(), rebuilt from its dumped dict."""
+        data = self.get(key)
+        if not data:
+            return None
+        return (build or model.model_validate)(data)
+    
+    def set_obj(self, key: str, obj: BaseModel, ttl: Optional[int] = None) -> bool:
+        """Store a model as its dumped dict."""
+        return self.set(key, obj.model_dump(), ttl)
 
 
 class InMemoryCache(CacheBackend):
@@ -41,16 +72,23 @@ class InMemoryCache(CacheBackend):
     def __init__(self):
         """Initialize in-memory cache."""
         self._data: Dict[str, tuple[Any, Optional[float]]] = {}
+        # (expiry, key) min-heap for proactive eviction; may hold stale entries
+        # for keys that were overwritten or deleted, checked again on pop
+        self._exp_heap: List[tuple[float, str]] = []
+        # TTL-less counters created by increment(); keys set() explicitly stay
+        # in _data so their expiry still applies
+        self._counters: Dict[str, int] = {}
     
     def get(self, key: str) -> Optional[Any]:
         """Get value from cache."""
-        if key not in self._data:
-            return None
+        entry = self._data.get(key)
+        if entry is None:
+            return self._counters.get(key)
         
-        value, expiry = self._data[key]
+        value, expiry = entry
         
         # Check if expired
-        if expiry is not None and time.time() > expiry:
+        if expiry is not None and time.monotonic() > expiry:
             del self._data[key]
             return None
         
@@ -60,26 +98,66 @@ class InMemoryCache(CacheBackend):
         """Set value in cache with optional TTL."""
         expiry = None
         if ttl is not None:
-            expiry = time.time() + ttl
+            now = time.monotonic()
+            expiry = now + ttl
+            # Evict anything already due before growing the heap
+            if self._exp_heap and self._exp_heap[0][0] <= now:
+                self.sweep(now)
+            heapq.heappush(self._exp_heap, (expiry, key))
         self._data[key] = (value, expiry)
+        self._counters.pop(key, None)
+        # Re-setting a live key leaves its old heap entry behind; bound the heap
+        # by the key count even before anything is due
+        if len(self._exp_heap) > 2 * len(self._data) + 64:
+            self._compact_heap()
         return True
     
+    def sweep(self, now: Optional[float] = None) -> int:
+        """Evict expired entries; return the number removed."""
+        if now is None:
+            now = time.monotonic()
+        
+        heap = self._exp_heap
+        removed = 0
+        while heap and heap[0][0] <= now:
+            expiry, key = heapq.heappop(heap)
+            entry = self._data.get(key)
+            # Skip stale heap entries whose key has since been re-set
+            if entry is not None and entry[1] == expiry:
+                del self._data[key]
+                removed += 1
+        
+        # Rebuild when stale entries from repeated sets dominate the heap
+        if len(heap) > 2 * len(self._data) + 64:
+            self._compact_heap()
+        
+        return removed
+    
+    def _compact_heap(self) -> None:
+        """Rebuild the expiry heap from live entries only."""
+        self._exp_heap = [
+            (expiry, key) for key, (_, expiry) in self._data.items()
+            if expiry is not None
+        ]
+        heapq.heapify(self._exp_heap)
+    
     def delete(self, key: str) -> bool:
         """Delete value from cache."""
         if key in self._data:
             del self._data[key]
             return True
-        return False
+        return self._counters.pop(key, None) is not None
     
     def exists(self, key: str) -> bool:
         """Check if key exists in cache."""
-        if key not in self._data:
-            return False
+        entry = self._data.get(key)
+        if entry is None:
+            return key in self._counters
         
-        value, expiry = self._data[key]
+        value, expiry = entry
         
         # Check if expired
-        if expiry is not None and time.time() > expiry:
+        if expiry is not None and time.monotonic() > expiry:
             del self._data[key]
             return False
         
@@ -87,13 +165,37 @@ class InMemoryCache(CacheBackend):
     
     def increment(self, key: str, amount: int = 1) -> int:
         """Increment numeric value."""
-        current = self.get(key)
-        if current is None:
-            current = 0
+        entry = self._data.get(key)
+        if entry is not None:
+            value, expiry = entry
+            # Explicitly set (possibly with a TTL) and still live: update in
+            # place, keeping its expiry; a stored None counts as 0
+            if expiry is None or time.monotonic() <= expiry:
+                new_value = (value or 0) + amount
+                self._data[key] = (new_value, expiry)
+                return new_value
+            del self._data[key]
         
-        new_value = current + amount
-        self._data[key] = (new_value, self._data.get(key, (None, None))[1])
+        counters = self._counters
+        new_value = counters.get(key, 0) + amount
+        counters[key] = new_value
         return new_value
+    
+    def get_obj(
+        self,
+        key: str,
+        model: Type[M],
+        build: Optional[Callable[[Dict[str, Any]], M]] = None
+    ) -> Optional[M]:
+        """Get a model by reference; dicts written with set() are rebuilt."""
+        value = self.get(key)
+        if isinstance(value, model):
+            return value
+        return super().get_obj(key, model, build)
+    
+    def set_obj(self, key: str, obj: BaseModel, ttl: Optional[int] = None) -> bool:
+        """Store a model by reference, skipping serialization."""
+        return self.set(key, obj, ttl)
 
 
 class RedisCache(CacheBackend):
@@ -107,7 +209,7 @@ class RedisCache(CacheBackend):
                 host=host,
                 port=port,
                 db=db,
-                decode_responses=True,
+                decode_responses=False,
                 socket_connect_timeout=5,
                 socket_keepalive=True
             )
@@ -119,33 +221,63 @@ class RedisCache(CacheBackend):
             self.available = False
             self.redis_client = None
     
+    # Leading byte marking msgpack-encoded values, distinguishing them from
+    # legacy JSON and plain-string entries
+    _MSGPACK_TAG = b"\x01"
+    
+    @classmethod
+    def _encode(cls, value: Any) -> Any:
+        """Serialize a value for Redis, msgpack for anything non-scalar."""
+        if isinstance(value, (str, bytes, int, float)) and not isinstance(value, bool):
+            return value
+        return cls._MSGPACK_TAG + msgpack.packb(value, use_bin_type=True)
+    
+    @classmethod
+    def _decode(cls, value: Optional[bytes]) -> Optional[Any]:
+        """Parse a raw Redis value, falling back to the plain string."""
+        if value is None:
+            return None
+        if value[:1] == cls._MSGPACK_TAG:
+            try:
+                return msgpack.unpackb(value[1:], raw=False)
+            except Exception:
+                pass
+        value = value.decode("utf-8", errors="replace")
+        # Legacy JSON entries and plain numbers
+        try:
+            return json.loads(value)
+        except json.JSONDecodeError:
+            return value
+    
     def get(self, key: str) -> Optional[Any]:
         """Get value from cache."""
         if not self.available:
             return None
         
         try:
-            value = self.redis_client.get(key)
-            if value is None:
-                return None
-            # Try to parse as JSON
-            try:
-                return json.loads(value)
-            except json.JSONDecodeError:
-                return value
+            return self._decode(self.redis_client.get(key))
         except Exception as e:
             print(f"Redis get error: {e}")
             return None
     
+    def mget(self, keys: List[str]) -> List[Optional[Any]]:
+        """Get several values in a single round-trip."""
+        if not self.available or not keys:
+            return [None] * len(keys)
+        
+        try:
+            return [self._decode(value) for value in self.redis_client.mget(keys)]
+        except Exception as e:
+            print(f"Redis mget error: {e}")
+            return [None] * len(keys)
+    
     def set(self, key: str, value: Any, ttl: Optional[int] = None) -> bool:
         """Set value in cache with optional TTL."""
         if not self.available:
             return False
         
         try:
-            # Serialize to JSON
-            if not isinstance(value, (str, int, float)):
-                value = json.dumps(value)
+            value = self._encode(value)
             
             if ttl is not None:
                 self.redis_client.setex(key, ttl, value)
@@ -188,6 +320,21 @@ class RedisCache(CacheBackend):
         except Exception as e:
             print(f"Redis increment error: {e}")
             return 0
+    
+    def incrby(self, key: str, amount: float, ttl: Optional[int] = None) -> float:
+        """Atomically add a float amount and refresh the TTL in one round-trip."""
+        if not self.available:
+            return 0.0
+        
+        try:
+            pipe = self.redis_client.pipeline(transaction=False)
+            pipe.incrbyfloat(key, amount)
+            if ttl is not None:
+                pipe.expire(key, ttl)
+            return float(pipe.execute()[0])
+        except Exception as e:
+            print(f"Redis incrby error: {e}")
+            return 0.0
 
 
 class Cache:
@@ -225,6 +372,27 @@ class Cache:
     def increment(self, key: str, amount: int = 1) -> int:
         """Increment numeric value."""
         return self._backend.increment(key, amount)
+    
+    def incrby(self, key: str, amount: float, ttl: Optional[int] = None) -> float:
+        """Add a float amount to a value, (re)setting its TTL."""
+        return self._backend.incrby(key, amount, ttl)
+    
+    def mget(self, keys: List[str]) -> List[Optional[Any]]:
+        """Get several values at once, in key order."""
+        return self._backend.mget(keys)
+    
+    def get_obj(
+        self,
+        key: str,
+        model: Type[M],
+        build: Optional[Callable[[Dict[str, Any]], M]] = None
+    ) -> Optional[M]:
+        """Get a model from cache."""
+        return self._backend.get_obj(key, model, build)
+    
+    def set_obj(self, key: str, obj: BaseModel, ttl: Optional[int] = None) -> bool:
+        """Set a model in cache with optional TTL."""
+        return self._backend.set_obj(key, obj, ttl)
 
 
 # Global cache instance
@@ -235,8 +403,8 @@ def get_cache() -> Cache:
     """Get or create the global cache instance."""
     global _cache
     if _cache is None:
-        from src.config import Settings
-        settings = Settings()
+        from src.config import get_settings
+        settings = get_settings()
         _cache = Cache(
             use_redis=settings.use_redis,
             host=settings.redis_host,
@@ -1,11 +1,19 @@
 
 
+import copy
 import os
 import yaml
-from typing import Dict, Any, Optional
+from functools import lru_cache
+from types import MappingProxyType
+from typing import Dict, Any, Callable, Optional, Mapping
 from pydantic_settings import BaseSettings
 from pathlib import Path
 
+try:
+    from yaml import CSafeLoader as _YamlLoader
+except ImportError:  # PyYAML built without libyaml
+    from yaml import SafeLoader as _YamlLoader
+
 
 class Settings(BaseSettings):
     """Application settings from environment variables."""
@@ -19,6 +27,7 @@ class Settings(BaseSettings):
     # Cache settings
     idempotency_ttl: int = int(os.getenv("IDEMPOTENCY_TTL", 86400))  # 24 hours
     persona_cache_ttl: int = int(os.getenv("PERSONA_CACHE_TTL", 3600))  # 1 hour
+    persona_l1_size: int = int(os.getenv("PERSONA_L1_SIZE", 10000))  # in-process entries
     last_reward_cache_ttl: int = int(os.getenv("LAST_REWARD_CACHE_TTL", 86400))  # 24 hours
     
     # Service settings
@@ -27,21 +36,68 @@ class Settings(BaseSettings):
     
     # Performance settings
     enable_idempotency: bool = os.getenv("ENABLE_IDEMPOTENCY", "true").lower() == "true"
+    enable_cors: bool = os.getenv("ENABLE_CORS", "false").lower() == "true"
     
     class Config:
         env_file = ".env"
         extra = "ignore"
 
 
+@lru_cache(maxsize=1)
+def get_settings() -> Settings:
+    """Get the shared settings instance; call get_settings.cache_clear() to re-read env."""
+    return Settings()
+
+
+@lru_cache(maxsize=16)
+def _parse_file(path: str, mtime_ns: int, loader: Callable[[bytes], Any]) -> Any:
+    """Parse a file with loader; cached per (path, mtime) so edits are picked up."""
+    with open(path, 'rb') as f:
+        return loader(f.read())
+
+
+def load_config_file(path: Path, loader: Callable[[bytes], Any]) -> Any:
+    """Load a config file through the parse cache, as a private deep copy."""
+    # The cached parse is shared; callers get their own copy to mutate freely
+    return copy.deepcopy(_parse_file(str(path), path.stat().st_mtime_ns, loader))
+
+
+def _load_yaml(data: bytes) -> Dict[str, Any]:
+    """Parse YAML bytes, treating an empty document as {}."""
+    return yaml.load(data, Loader=_YamlLoader) or {}
+
+
 class PolicyConfig:
     """Load and manage policy configuration."""
     
     def __init__(self, config_path: str = None):
         """Initialize policy configuration."""
-        settings = Settings()
-        config_path = config_path or settings.policy_config_path
+        config_path = config_path or get_settings().policy_config_path
         self.config = self._load_config(config_path)
         self.version = self.config.get("version", "v1.0.0")
+        
+        # Resolve every policy value once so hot-path reads are plain attributes
+        reward_types = self.config.get("reward_types") or {}
+        xp = self.config.get("xp") or {}
+        cac = self.config.get("cac") or {}
+        features = self.config.get("features") or {}
+        
+        self.reward_type_weights: Mapping[str, float] = MappingProxyType({
+            reward_type: (config_data or {}).get("weight", 0)
+            for reward_type, config_data in reward_types.items()
+        })
+        self.xp_per_rupee: float = xp.get("xp_per_rupee", 0.1)
+        self.max_xp_per_txn: int = xp.get("max_xp_per_txn", 500)
+        self.persona_multipliers: Mapping[str, float] = MappingProxyType(
+            dict(xp.get("persona_multipliers") or {})
+        )
+        self.daily_cac_caps: Mapping[str, int] = MappingProxyType(
+            dict(cac.get("daily_cap_per_persona") or {})
+        )
+        self.cac_fallback_to_xp: bool = bool(cac.get("fallback_to_xp", True))
+        self.prefer_xp_mode: bool = bool(features.get("prefer_xp_mode", False))
+        self.cooldown_enabled: bool = bool(features.get("cooldown_enabled", False))
+        self.cooldown_hours: int = features.get("cooldown_hours", 24)
     
     def _load_config(self, config_path: str) -> Dict[str, Any]:
         """Load YAML configuration file."""
@@ -50,9 +106,7 @@ class PolicyConfig:
             # Return default config if file doesn't exist
             return self._default_config()
         
-        with open(path, 'r') as f:
-            config = yaml.safe_load(f)
-        return config or {}
+        return load_config_file(path, _load_yaml)
     
     def _default_config(self) -> Dict[str, Any]:
         """Return default policy configuration."""
@@ -100,45 +154,31 @@ class PolicyConfig:
     
     def get_reward_type_weights(self) -> Dict[str, float]:
         """Get reward type weights."""
-        weights = {}
-        reward_types = self.config.get("reward_types", {})
-        for reward_type, config_data in reward_types.items():
-            weights[reward_type] = config_data.get("weight", 0)
-        return weights
+        return dict(self.reward_type_weights)
     
     def get_xp_per_rupee(self) -> float:
         """Get XP per rupee rate."""
-        return self.config.get("xp", {}).get("xp_per_rupee", 0.1)
+        return self.xp_per_rupee
     
     def get_max_xp_per_txn(self) -> int:
         """Get max XP per transaction."""
-        return self.config.get("xp", {}).get("max_xp_per_txn", 500)
+        return self.max_xp_per_txn
     
     def get_persona_multiplier(self, persona: str) -> float:
         """Get XP multiplier for a persona."""
-        multipliers = self.config.get("xp", {}).get("persona_multipliers", {})
-        return multipliers.get(persona, 1.0)
+        return self.persona_multipliers.get(persona, 1.0)
     
     def get_daily_cac_cap(self, persona: str) -> int:
         """Get daily CAC cap for a persona."""
-        caps = self.config.get("cac", {}).get("daily_cap_per_persona", {})
-        return caps.get(persona, 0)
+        return self.daily_cac_caps.get(persona, 0)
     
     def get_cac_fallback_to_xp(self) -> bool:
         """Check if CAC should fallback to XP."""
-        return self.config.get("cac", {}).get("fallback_to_xp", True)
-    
-    def prefer_xp_mode(self) -> bool:
-        """Check if XP mode is preferred."""
-        return self.config.get("features", {}).get("prefer_xp_mode", False)
-    
-    def cooldown_enabled(self) -> bool:
-        """Check if cooldown feature is enabled."""
-        return self.config.get("features", {}).get("cooldown_enabled", False)
+        return self.cac_fallback_to_xp
     
     def get_cooldown_hours(self) -> int:
         """Get cooldown period in hours."""
-        return self.config.get("features", {}).get("cooldown_hours", 24)
+        return self.cooldown_hours
 
 
 # Global policy config instance
@@ -1,27 +1,29 @@
 
 
 from fastapi import FastAPI, HTTPException
-from fastapi.responses import JSONResponse
+from fastapi.responses import ORJSONResponse
 from fastapi.middleware.cors import CORSMiddleware
 from src.models import RewardDecisionRequest, RewardDecisionResponse
 from src.reward_logic import get_reward_engine
-from src.config import get_policy_config
+from src.config import get_policy_config, get_settings
 
 # Create FastAPI app
 app = FastAPI(
     title="Reward Decision Service",
     description="Low-latency microservice for deterministic reward decisions",
-    version="1.0.0"
+    version="1.0.0",
+    default_response_class=ORJSONResponse
 )
 
-# Add CORS middleware
-app.add_middleware(
-    CORSMiddleware,
-    allow_origins=["*"],
-    allow_credentials=True,
-    allow_methods=["*"],
-    allow_headers=["*"],
-)
+# CORS is opt-in: callers are services, and the middleware runs on every request
+if get_settings().enable_cors:
+    app.add_middleware(
+        CORSMiddleware,
+        allow_origins=["*"],
+        allow_credentials=True,
+        allow_methods=["*"],
+        allow_headers=["*"],
+    )
 
 
 @app.get("/health", tags=["Health"])
@@ -41,7 +43,7 @@ async def health_check():
     summary="Get reward decision for a transaction",
     description="Returns a deterministic reward outcome for each transaction"
 )
-async def decide_reward(request: RewardDecisionRequest) -> RewardDecisionResponse:
+async def decide_reward(request: RewardDecisionRequest) -> ORJSONResponse:
     """
     Decide reward for a transaction.
     
@@ -65,7 +67,9 @@ async def decide_reward(request: RewardDecisionRequest) -> RewardDecisionRespons
     try:
         engine = get_reward_engine()
         response = engine.decide(request)
-        return response
+        # Returning the response directly skips FastAPI re-validating the
+        # already-built model against response_model
+        return ORJSONResponse(response.model_dump())
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error processing reward decision: {str(e)}")
 
@@ -1,12 +1,20 @@
 
 
-from typing import Optional, List, Dict, Any
-from pydantic import BaseModel, Field
-from enum import Enum
+from typing import Optional, List, Dict, Any, Literal
+from pydantic import BaseModel, ConfigDict, Field
 from datetime import datetime
 
+try:
+    from enum import StrEnum
+except ImportError:  # Python < 3.11
+    from enum import Enum
 
-class RewardType(str, Enum):
+    class StrEnum(str, Enum):
+        """Fallback with StrEnum's plain-value str()."""
+        __str__ = str.__str__
+
+
+class RewardType(StrEnum):
     """Types of rewards that can be offered."""
     XP = "XP"
     CHECKOUT = "CHECKOUT"
@@ -22,8 +30,12 @@ class RewardDecisionRequest(BaseModel):
     txn_type: str = Field(..., description="Transaction type (e.g., 'purchase')")
     ts: Optional[int] = Field(None, description="Transaction timestamp (unix)")
 
-    class Config:
-        json_schema_extra = {
+    model_config = ConfigDict(
+        extra="ignore",
+        str_strip_whitespace=False,
+        validate_assignment=False,
+        arbitrary_types_allowed=False,
+        json_schema_extra={
             "example": {
                 "txn_id": "txn_12345",
                 "user_id": "user_789",
@@ -33,20 +45,26 @@ class RewardDecisionRequest(BaseModel):
                 "ts": 1705689600
             }
         }
+    )
 
 
 class RewardDecisionResponse(BaseModel):
     """Response model for /reward/decide endpoint."""
     decision_id: str = Field(..., description="Unique decision ID (UUID)")
     policy_version: str = Field(..., description="Policy version applied")
-    reward_type: RewardType = Field(..., description="Type of reward")
+    # Literal validates by plain string match, skipping Enum coercion
+    reward_type: Literal["XP", "CHECKOUT", "GOLD"] = Field(..., description="Type of reward")
     reward_value: int = Field(..., ge=0, description="Monetary reward value")
     xp: int = Field(..., ge=0, description="XP points awarded")
     reason_codes: List[str] = Field(default_factory=list, description="Reason codes for decision")
     meta: Dict[str, Any] = Field(default_factory=dict, description="Additional metadata")
 
-    class Config:
-        json_schema_extra = {
+    model_config = ConfigDict(
+        extra="ignore",
+        str_strip_whitespace=False,
+        validate_assignment=False,
+        arbitrary_types_allowed=False,
+        json_schema_extra={
             "example": {
                 "decision_id": "dec_uuid_12345",
                 "policy_version": "v1.0.0",
@@ -57,9 +75,10 @@ class RewardDecisionResponse(BaseModel):
                 "meta": {"persona": "RETURNING", "multiplier": 1.5}
             }
         }
+    )
 
 
-class PersonaType(str, Enum):
+class PersonaType(StrEnum):
     """User personas."""
     NEW = "NEW"
     RETURNING = "RETURNING"
@@ -1,20 +1,48 @@
 
 
-import json
-from typing import Optional, Dict
+from typing import Optional, Any, Dict
 from pathlib import Path
+from cachetools import TTLCache
 from src.models import UserPersona, PersonaType
 from src.cache import get_cache
-from src.config import Settings
+from src.config import get_settings, load_config_file
+
+try:
+    from orjson import loads as _json_loads
+except ImportError:  # orjson is optional; stdlib parser is slower but equivalent
+    from json import loads as _json_loads
+
+# Value -> member map; avoids Enum.__call__ lookup machinery per persona build
+_PERSONA_TYPES: Dict[str, PersonaType] = {p.value: p for p in PersonaType}
+
+
+def _persona_from_cache(cached: dict) -> UserPersona:
+    """Rebuild a persona from a serializing backend's dict."""
+    # Cached data came from our own model_dump(), so skip validation;
+    # persona may be a plain string when the backend serializes values
+    return UserPersona.model_construct(
+        user_id=cached["user_id"],
+        persona=_PERSONA_TYPES[cached["persona"]],
+        lifetime_purchases=cached.get("lifetime_purchases", 0),
+        last_reward_ts=cached.get("last_reward_ts")
+    )
 
 
 class PersonaService:
     """Service for managing user personas."""
     
+    __slots__ = ("settings", "cache", "_l1", "_personas_data")
+    
     def __init__(self):
         """Initialize persona service."""
-        self.settings = Settings()
+        self.settings = get_settings()
         self.cache = get_cache()
+        # Process-local L1 of built personas in front of the shared cache.
+        # Not thread-safe; requests are handled on a single event loop.
+        self._l1: TTLCache = TTLCache(
+            maxsize=self.settings.persona_l1_size,
+            ttl=self.settings.persona_cache_ttl
+        )
         self._personas_data = self._load_personas()
     
     def _load_personas(self) -> Dict[str, dict]:
@@ -23,8 +51,7 @@ class PersonaService:
         
         if config_path.exists():
             try:
-                with open(config_path, 'r') as f:
-                    return json.load(f)
+                return load_config_file(config_path, _json_loads)
             except Exception as e:
                 print(f"Error loading personas file: {e}")
                 return {}
@@ -32,20 +59,38 @@ class PersonaService:
         # Return empty dict if file doesn't exist
         return {}
     
-    def get_persona(self, user_id: str) -> UserPersona:
-        """Get or infer user persona."""
-        # Check cache first
+    def get_persona(
+        self,
+        user_id: str,
+        prefetched: Optional[Dict[str, Any]] = None
+    ) -> UserPersona:
+        """Get or infer user persona; prefetched holds values already read from our cache."""
+        persona = self._l1.get(user_id)
+        if persona is not None:
+            return persona
+        
+        # Check shared cache next, reusing a batched read when the caller has one
         cache_key = f"persona:{user_id}"
-        cached = self.cache.get(cache_key)
-        if cached:
-            return UserPersona(**cached)
+        if prefetched is not None and cache_key in prefetched:
+            cached = prefetched[cache_key]
+            if not cached:
+                persona = None
+            elif isinstance(cached, UserPersona):
+                persona = cached
+            else:
+                persona = _persona_from_cache(cached)
+        else:
+            persona = self.cache.get_obj(cache_key, UserPersona, _persona_from_cache)
+        if persona is not None:
+            self._l1[user_id] = persona
+            return persona
         
         # Check in personas data file
         if user_id in self._personas_data:
             persona_data = self._personas_data[user_id]
             persona = UserPersona(
                 user_id=user_id,
-                persona=PersonaType(persona_data.get("persona", "NEW")),
+                persona=_PERSONA_TYPES[persona_data.get("persona", "NEW")],
                 lifetime_purchases=persona_data.get("lifetime_purchases", 0),
                 last_reward_ts=persona_data.get("last_reward_ts")
             )
@@ -58,11 +103,8 @@ class PersonaService:
             )
         
         # Cache the persona
-        self.cache.set(
-            cache_key,
-            persona.model_dump(),
-            ttl=self.settings.persona_cache_ttl
-        )
+        self.cache.set_obj(cache_key, persona, ttl=self.settings.persona_cache_ttl)
+        self._l1[user_id] = persona
         
         return persona
     
@@ -70,11 +112,11 @@ class PersonaService:
         """Update persona information."""
         self._personas_data[user_id] = persona.model_dump()
         
-        # Update cache
-        cache_key = f"persona:{user_id}"
-        self.cache.set(
-            cache_key,
-            persona.model_dump(),
+        # Update both cache tiers
+        self._l1[user_id] = persona
+        self.cache.set_obj(
+            f"persona:{user_id}",
+            persona,
             ttl=self.settings.persona_cache_ttl
         )
     
@@ -82,10 +124,7 @@ class PersonaService:
         """Infer persona based on lifetime purchases."""
         if lifetime_purchases == 0:
             return PersonaType.NEW
-        elif lifetime_purchases >= 10:
-            return PersonaType.POWER
-        else:
-            return PersonaType.RETURNING
+        return PersonaType.POWER if lifetime_purchases >= 10 else PersonaType.RETURNING
 
 
 # Global persona service instance
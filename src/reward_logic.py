@@ -1,180 +1,289 @@
 
 
+import time
 import uuid
-from datetime import datetime
-from typing import Optional, List, Dict, Any
-from src.models import RewardDecisionRequest, RewardDecisionResponse, RewardType
-from src.config import get_policy_config
+import zlib
+from typing import Optional, Any, Dict, Tuple
+from src.models import RewardDecisionRequest, RewardDecisionResponse, RewardType, PersonaType
+from src.config import get_policy_config, PolicyConfig
 from src.cache import get_cache
 from src.persona import get_persona_service
-from src.config import Settings
+from src.config import get_settings
+
+# Monetary reward as a fraction of the transaction amount
+_REWARD_RATES: Dict[RewardType, float] = {
+    RewardType.XP: 0.0,
+    RewardType.CHECKOUT: 0.05,  # 5% cashback
+    RewardType.GOLD: 0.02,  # 2% gold
+}
+
+# Reason code for each persona and for the reward type chosen
+_PERSONA_CODE: Dict[str, str] = {
+    "NEW": "NEW_USER",
+    "RETURNING": "RETURNING_USER",
+    "POWER": "POWER_USER",
+}
+_REWARD_CODE: Dict[RewardType, str] = {
+    RewardType.XP: "XP_MODE_ENABLED",
+    RewardType.CHECKOUT: "CHECKOUT_REWARD",
+    RewardType.GOLD: "GOLD_REWARD",
+}
+
+# Namespace for decision ids derived from the idempotency key
+DECISION_NS = uuid.UUID("6b1f3c2e-9d4a-5e57-8c0f-2a7d4e9b1c63")
 
 
 class RewardDecisionEngine:
     """Core engine for reward decision making."""
     
+    # Fixed attribute layout; reload() must only assign names listed here
+    __slots__ = (
+        "_policy_config",
+        "cache",
+        "persona_service",
+        "settings",
+        "_xp_per_rupee",
+        "_max_xp",
+        "_multipliers",
+        "_daily_caps",
+        "_weight_table",
+        "_rates",
+        "_prefer_xp",
+        "_cooldown_enabled",
+        "_cooldown_seconds",
+        "_reason_table",
+        "_persona_meta",
+    )
+    
     def __init__(self):
         """Initialize reward decision engine."""
         self.policy_config = get_policy_config()
         self.cache = get_cache()
         self.persona_service = get_persona_service()
-        self.settings = Settings()
+        self.settings = get_settings()
+    
+    @property
+    def policy_config(self) -> PolicyConfig:
+        """Active policy; assigning a new one refreshes the cached values."""
+        return self._policy_config
+    
+    @policy_config.setter
+    def policy_config(self, policy_config: PolicyConfig) -> None:
+        self._policy_config = policy_config
+        self.reload()
+    
+    def reload(self) -> None:
+        """Snapshot policy values used on every decision."""
+        policy = self._policy_config
+        personas = [p.value for p in PersonaType]
+        self._xp_per_rupee = policy.get_xp_per_rupee()
+        self._max_xp = policy.get_max_xp_per_txn()
+        self._multipliers = {p: policy.get_persona_multiplier(p) for p in personas}
+        self._daily_caps = {p: policy.get_daily_cac_cap(p) for p in personas}
+        # Cumulative integer thresholds over 0-99, in policy order; names that
+        # are not a RewardType select XP, as before
+        table = []
+        cumulative = 0
+        for name, weight in policy.get_reward_type_weights().items():
+            cumulative += int(weight * 100)
+            reward_type = RewardType.__members__.get(name, RewardType.XP)
+            table.append((reward_type, cumulative))
+        self._weight_table = tuple(table)
+        self._rates = _REWARD_RATES
+        self._prefer_xp = policy.prefer_xp_mode
+        self._cooldown_enabled = policy.cooldown_enabled
+        self._cooldown_seconds = policy.get_cooldown_hours() * 3600
+        # Persona-invariant part of the response meta, merged per request
+        self._persona_meta = {
+            p: {"persona": p, "multiplier": self._multipliers[p]} for p in personas
+        }
+        # Reason codes depend only on persona, reward type and the flags above
+        self._reason_table = {
+            (persona, reward_type): self._build_reason_codes(persona, reward_type)
+            for persona in personas
+            for reward_type in RewardType
+        }
     
     def decide(self, request: RewardDecisionRequest) -> RewardDecisionResponse:
         """Make a reward decision for a transaction."""
-        # Check idempotency
-        if self.settings.enable_idempotency:
-            idempotency_key = self._build_idempotency_key(request)
-            cached_response = self.cache.get(idempotency_key)
+        # Hot attributes as locals; read per call so reassigned backends are honoured
+        cache = self.cache
+        settings = self.settings
+        user_id = request.user_id
+        amount = request.amount
+        
+        persona_service = self.persona_service
+        day = self._day_index()
+        
+        # The key also seeds the decision id, so it is built even without idempotency
+        idempotency_key = self._build_idempotency_key(request)
+        enable_idempotency = settings.enable_idempotency
+        
+        # Read every key this decision may need in one round-trip (one MGET on
+        # Redis); the persona key only when both share the same cache
+        keys = [idempotency_key] if enable_idempotency else []
+        if persona_service.cache is cache:
+            keys.append(f"persona:{user_id}")
+        if not self._prefer_xp:
+            keys.append(f"cac:{user_id}:{day}")
+            if self._cooldown_enabled:
+                keys.append(f"last_reward:{user_id}")
+        prefetched = dict(zip(keys, cache.mget(keys)))
+        
+        if enable_idempotency:
+            cached_response = prefetched[idempotency_key]
             if cached_response:
-                return RewardDecisionResponse(**cached_response)
+                # Stored by this engine from a validated decision; skip re-validation
+                return RewardDecisionResponse.model_construct(**cached_response)
         
         # Get user persona
-        persona = self.persona_service.get_persona(request.user_id)
+        persona = persona_service.get_persona(user_id, prefetched)
+        persona_str = persona.persona.value
         
         # Calculate XP
-        xp = self._calculate_xp(request.amount, persona.persona.value)
+        xp = self._calculate_xp(amount, persona_str)
         
         # Determine reward type and value
         reward_type, reward_value = self._determine_reward(
-            request.user_id,
-            persona.persona.value,
-            request.amount,
-            xp
+            user_id,
+            persona_str,
+            amount,
+            xp,
+            day,
+            prefetched
         )
         
-        # Generate decision
+        # Generate decision; the id is deterministic so a recompute after cache
+        # expiry (or on another replica) yields the same decision_id
         decision = RewardDecisionResponse(
-            decision_id=str(uuid.uuid4()),
-            policy_version=self.policy_config.version,
-            reward_type=reward_type,
+            decision_id=str(uuid.uuid5(DECISION_NS, idempotency_key)),
+            policy_version=self._policy_config.version,
+            reward_type=reward_type.value,
             reward_value=reward_value,
             xp=xp,
-            reason_codes=self._get_reason_codes(persona.persona.value, reward_type),
+            reason_codes=self._get_reason_codes(persona_str, reward_type),
             meta={
-                "persona": persona.persona.value,
-                "multiplier": self.policy_config.get_persona_multiplier(persona.persona.value),
+                **self._persona_meta[persona_str],
                 "txn_id": request.txn_id,
-                "user_id": request.user_id,
+                "user_id": user_id,
                 "merchant_id": request.merchant_id
             }
         )
         
         # Cache the response for idempotency
-        if self.settings.enable_idempotency:
-            idempotency_key = self._build_idempotency_key(request)
-            self.cache.set(
-                idempotency_key,
-                decision.model_dump(),
-                ttl=self.settings.idempotency_ttl
-            )
+        if enable_idempotency:
+            payload = decision.model_dump()
+            cache.set(idempotency_key, payload, ttl=settings.idempotency_ttl)
+        
+        # Count monetary rewards against the daily CAC cap; one cache call
+        if reward_type is not RewardType.XP and self._daily_caps[persona_str] > 0:
+            self._update_daily_cac_spend(user_id, amount, day)
         
-        # Update last reward timestamp
-        self._update_last_reward(request.user_id, request.ts)
+        # Last reward timestamp is only read by the cooldown check
+        if self._cooldown_enabled:
+            self._update_last_reward(user_id, request.ts)
         
         return decision
     
     def _build_idempotency_key(self, request: RewardDecisionRequest) -> str:
         """Build idempotency key from request."""
-        key_parts = [request.txn_id, request.user_id, request.merchant_id]
-        return f"idem:{':'.join(key_parts)}"
+        return f"idem:{request.txn_id}:{request.user_id}:{request.merchant_id}"
     
     def _calculate_xp(self, amount: float, persona: str) -> int:
         """Calculate XP based on amount and persona."""
-        xp_per_rupee = self.policy_config.get_xp_per_rupee()
-        max_xp = self.policy_config.get_max_xp_per_txn()
-        multiplier = self.policy_config.get_persona_multiplier(persona)
-        
-        calculated_xp = int(amount * xp_per_rupee * multiplier)
-        return min(calculated_xp, max_xp)
+        return min(int(amount * self._xp_per_rupee * self._multipliers[persona]), self._max_xp)
     
     def _determine_reward(
         self,
         user_id: str,
         persona: str,
         amount: float,
-        xp: int
+        xp: int,
+        day: Optional[int] = None,
+        prefetched: Optional[Dict[str, Any]] = None
     ) -> tuple[RewardType, int]:
         """Determine reward type and value based on policy and CAC cap."""
-        daily_cap = self.policy_config.get_daily_cac_cap(persona)
-        
-        # Check daily CAC
-        if daily_cap > 0:
-            daily_spend = self._get_daily_cac_spend(user_id)
-            
-            if daily_spend + amount > daily_cap:
-                # CAC exceeded, return only XP
-                if self.policy_config.get_cac_fallback_to_xp():
-                    return RewardType.XP, 0
-                else:
-                    return RewardType.XP, 0
-        
-        # Check if XP mode is preferred
-        if self.policy_config.prefer_xp_mode():
+        # Cheapest exits first: flags and the cap need no cache round-trip
+        if self._prefer_xp:
+            return RewardType.XP, 0
+        
+        # A zero cap allows no monetary reward at all (the NEW-user default)
+        daily_cap = self._daily_caps[persona]
+        if daily_cap <= 0:
             return RewardType.XP, 0
         
         # Check cooldown if enabled
-        if self.policy_config.cooldown_enabled():
-            if self._is_in_cooldown(user_id):
-                return RewardType.XP, 0
+        if self._cooldown_enabled and self._is_in_cooldown(user_id, prefetched):
+            return RewardType.XP, 0
         
-        # Default reward type
-        weights = self.policy_config.get_reward_type_weights()
+        # Check daily CAC; exceeding it falls back to XP only
+        if self._get_daily_cac_spend(user_id, day, prefetched) + amount > daily_cap:
+            return RewardType.XP, 0
         
-        # Simple deterministic selection based on user_id hash
-        seed = hash(user_id) % 100
-        cumulative = 0
+        # Deterministic selection based on a stable user_id hash; builtin hash()
+        # is salted per process, so it differs across restarts and replicas
+        seed = zlib.crc32(user_id.encode("utf-8")) % 100
         
-        for reward_type, weight in weights.items():
-            cumulative += int(weight * 100)
-            if seed < cumulative:
-                if reward_type == "CHECKOUT":
-                    return RewardType.CHECKOUT, int(amount * 0.05)  # 5% cashback
-                elif reward_type == "GOLD":
-                    return RewardType.GOLD, int(amount * 0.02)  # 2% gold
-                else:
-                    return RewardType.XP, 0
+        for reward_type, threshold in self._weight_table:
+            if seed < threshold:
+                return reward_type, int(amount * self._rates[reward_type])
         
         return RewardType.XP, 0
     
-    def _get_daily_cac_spend(self, user_id: str) -> float:
+    def _day_index(self) -> int:
+        """Current UTC day bucket used in CAC keys."""
+        return int(time.time()) // 86400
+    
+    def _read(self, key: str, prefetched: Optional[Dict[str, Any]]) -> Optional[Any]:
+        """Get a value from the batch read in decide(), or from the cache."""
+        if prefetched is not None and key in prefetched:
+            return prefetched[key]
+        return self.cache.get(key)
+    
+    def _get_daily_cac_spend(
+        self,
+        user_id: str,
+        day: Optional[int] = None,
+        prefetched: Optional[Dict[str, Any]] = None
+    ) -> float:
         """Get total CAC spend for the day."""
-        today = datetime.now().strftime("%Y-%m-%d")
-        cache_key = f"cac:{user_id}:{today}"
+        cache_key = f"cac:{user_id}:{self._day_index() if day is None else day}"
         
-        cached = self.cache.get(cache_key)
+        cached = self._read(cache_key, prefetched)
         return cached or 0.0
     
-    def _update_daily_cac_spend(self, user_id: str, amount: float) -> None:
+    def _update_daily_cac_spend(
+        self,
+        user_id: str,
+        amount: float,
+        day: Optional[int] = None
+    ) -> None:
         """Update daily CAC spend."""
-        today = datetime.now().strftime("%Y-%m-%d")
-        cache_key = f"cac:{user_id}:{today}"
+        if day is None:
+            day = self._day_index()
+        cache_key = f"cac:{user_id}:{day}"
         
-        current = self._get_daily_cac_spend(user_id)
-        self.cache.set(
-            cache_key,
-            current + amount,
-            ttl=86400  # 24 hours
-        )
+        self.cache.incrby(cache_key, amount, ttl=86400)  # 24 hours
     
-    def _is_in_cooldown(self, user_id: str) -> bool:
+    def _is_in_cooldown(
+        self,
+        user_id: str,
+        prefetched: Optional[Dict[str, Any]] = None
+    ) -> bool:
         """Check if user is in cooldown period."""
         cache_key = f"last_reward:{user_id}"
-        last_reward_ts = self.cache.get(cache_key)
+        last_reward_ts = self._read(cache_key, prefetched)
         
         if last_reward_ts is None:
             return False
         
-        cooldown_hours = self.policy_config.get_cooldown_hours()
-        cooldown_seconds = cooldown_hours * 3600
-        
-        current_ts = int(datetime.now().timestamp())
-        return (current_ts - last_reward_ts) < cooldown_seconds
+        current_ts = int(time.time())
+        return (current_ts - last_reward_ts) < self._cooldown_seconds
     
     def _update_last_reward(self, user_id: str, ts: Optional[int]) -> None:
         """Update last reward timestamp."""
         cache_key = f"last_reward:{user_id}"
-        timestamp = ts or int(datetime.now().timestamp())
+        timestamp = ts or int(time.time())
         
         self.cache.set(
             cache_key,
@@ -182,31 +291,21 @@ class RewardDecisionEngine:
             ttl=self.settings.last_reward_cache_ttl
         )
     
-    def _get_reason_codes(self, persona: str, reward_type: RewardType) -> List[str]:
-        """Generate reason codes for the decision."""
-        codes = []
-        
-        if persona == "NEW":
-            codes.append("NEW_USER")
-        elif persona == "RETURNING":
-            codes.append("RETURNING_USER")
-        elif persona == "POWER":
-            codes.append("POWER_USER")
-        
-        if reward_type == RewardType.XP:
-            codes.append("XP_MODE_ENABLED")
-        elif reward_type == RewardType.CHECKOUT:
-            codes.append("CHECKOUT_REWARD")
-        elif reward_type == RewardType.GOLD:
-            codes.append("GOLD_REWARD")
-        
-        if self.policy_config.prefer_xp_mode():
+    def _get_reason_codes(self, persona: str, reward_type: RewardType) -> Tuple[str, ...]:
+        """Look up the precomputed reason codes for the decision."""
+        return self._reason_table[(persona, reward_type)]
+    
+    def _build_reason_codes(self, persona: str, reward_type: RewardType) -> Tuple[str, ...]:
+        """Generate reason codes for a persona/reward type under the current policy."""
+        codes = [_PERSONA_CODE[persona], _REWARD_CODE[reward_type]]
+        
+        if self._prefer_xp:
             codes.append("PREFER_XP_MODE")
         
-        if self.policy_config.cooldown_enabled():
+        if self._cooldown_enabled:
             codes.append("COOLDOWN_POLICY_ENABLED")
         
-        return codes
+        return tuple(codes)
 
 
 # Global reward decision engine instance
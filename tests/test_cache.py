@@ -0,0 +1,98 @@
+
+
+import pytest
+import time
+from src.cache import Cache
+from src.models import UserPersona, PersonaType
+
+
+class TestInMemoryCache:
+    """Test in-memory cache TTL handling."""
+
+    def test_set_and_get(self, cache):
+        """Test that values round-trip through the cache."""
+        cache.set("key_001", {"a": 1})
+        assert cache.get("key_001") == {"a": 1}
+        assert cache.exists("key_001")
+
+    def test_mget_returns_values_in_key_order(self):
+        """Test that mget returns one value per key, None for misses."""
+        cache = Cache()
+        cache.set("key_007", 1)
+        cache.set("key_008", {"b": 2}, ttl=3600)
+        
+        assert cache.mget(["key_008", "missing_key", "key_007"]) == [{"b": 2}, None, 1]
+    
+    def test_sweep_evicts_expired_entries(self, cache):
+        """Test that sweep removes entries whose TTL has elapsed."""
+        cache.set("short_ttl", "value", ttl=1)
+        cache.set("long_ttl", "value", ttl=3600)
+        cache.set("no_ttl", "value")
+
+        removed = cache.sweep(time.monotonic() + 2)
+
+        assert removed == 1
+        assert "short_ttl" not in cache._data
+        assert cache.get("long_ttl") == "value"
+        assert cache.get("no_ttl") == "value"
+
+    def test_sweep_ignores_overwritten_keys(self, cache):
+        """Test that re-setting a key with a longer TTL keeps it alive."""
+        cache.set("key_002", "old", ttl=1)
+        cache.set("key_002", "new", ttl=3600)
+
+        removed = cache.sweep(time.monotonic() + 2)
+
+        assert removed == 0
+        assert cache.get("key_002") == "new"
+
+    def test_heap_bounded_when_key_is_reset(self, cache):
+        """Test that re-setting one key does not grow the expiry heap unboundedly."""
+        for i in range(10000):
+            cache.set("key_005", i, ttl=86400)
+        
+        assert len(cache._data) == 1
+        assert len(cache._exp_heap) <= 2 * len(cache._data) + 65
+        assert cache.get("key_005") == 9999
+    
+    def test_sweep_before_expiry_keeps_entries(self, cache):
+        """Test that sweep leaves unexpired entries in place."""
+        cache.set("key_003", "value", ttl=3600)
+
+        assert cache.sweep() == 0
+        assert cache.get("key_003") == "value"
+    
+    def test_increment_counters(self, cache):
+        """Test that counters increment in place and respect explicit TTL keys."""
+        assert cache.increment("counter_001") == 1
+        assert cache.increment("counter_001", 5) == 6
+        assert cache.get("counter_001") == 6
+        
+        cache.set("counter_002", 10, ttl=3600)
+        assert cache.increment("counter_002") == 11
+        assert cache._data["counter_002"][1] is not None
+    
+    def test_increment_key_set_to_none(self, cache):
+        """Test that incrementing a key explicitly set to None starts from 0."""
+        cache.set("counter_003", None)
+        
+        assert cache.increment("counter_003") == 1
+        assert cache.get("counter_003") == 1
+        assert "counter_003" not in cache._counters
+    
+    def test_set_obj_stores_reference(self, cache):
+        """Test that models are stored and returned without copying."""
+        persona = UserPersona(user_id="user_cache_001", persona=PersonaType.POWER)
+        cache.set_obj("key_004", persona, ttl=3600)
+        
+        assert cache.get_obj("key_004", UserPersona) is persona
+    
+    def test_get_obj_rebuilds_dumped_dict(self, cache):
+        """Test that a dict written with set() is rebuilt into the model."""
+        persona = UserPersona(user_id="user_cache_002", persona=PersonaType.RETURNING)
+        cache.set("key_006", persona.model_dump(), ttl=3600)
+        
+        rebuilt = cache.get_obj("key_006", UserPersona)
+        
+        assert rebuilt == persona
+        assert cache.get_obj("missing_key", UserPersona) is None
@@ -122,6 +122,22 @@ class TestIdempotency:
         assert cached is not None
         assert cached["decision_id"] == response1.decision_id
     
+    def test_decision_id_stable_after_cache_expiry(self, reward_engine):
+        """Test that a recomputed decision keeps the same decision ID."""
+        request = RewardDecisionRequest(
+            txn_id="txn_idem_009",
+            user_id="user_idem_009",
+            merchant_id="merchant_001",
+            amount=1000.0,
+            txn_type="purchase"
+        )
+        
+        response1 = reward_engine.decide(request)
+        reward_engine.cache.delete(reward_engine._build_idempotency_key(request))
+        response2 = reward_engine.decide(request)
+        
+        assert response1.decision_id == response2.decision_id
+    
     def test_idempotency_ttl_respected(self, reward_engine, cache):
         """Test that idempotency TTL is respected."""
         # Override cache with short TTL